@@ -1,3 +1,5 @@
+import asyncio
+import contextvars
 import gc
 import json
 import os
@@ -12,21 +14,25 @@ import sys
 import tempfile
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial, wraps
 from glob import glob
 from importlib.resources import files
+from itertools import chain
 
 import click
 import gradio as gr
 import librosa
 import numpy as np
 import psutil
+import soundfile as sf
 import torch
 import torchaudio
 from cached_path import cached_path
 from datasets import Dataset as Dataset_
 from datasets.arrow_writer import ArrowWriter
 from safetensors.torch import load_file, save_file
-from scipy.io import wavfile
 
 from f5_tts.api import F5TTS
 from f5_tts.infer.utils_infer import transcribe
@@ -52,16 +58,33 @@ def _safe_project_path(base: str, name: str) -> str:
 training_process = None
 system = platform.system()
 python_executable = sys.executable or "python"
-tts_api = None
-last_checkpoint = ""
-last_device = ""
-last_ema = None
+
+# parsed setting.json per file, as (mtime_ns, settings)
+settings_cache = {}
+
+# project folders found in path_data, as (mtime_ns, project_list, projects_selelect)
+projects_cache = None
+
+# loaded F5TTS inference models, keyed by the load_tts_api arguments
+tts_api_cache = {}
+# get_tts_api runs on the GPU thread while clears come from Gradio workers
+tts_api_lock = threading.Lock()
+
+# Step number in checkpoint / sample names, e.g. model_1000.pt, update_1000_gen.wav
+checkpoint_number_pattern = re.compile(r"_(\d+)")
+
+# progress bar line printed by the trainer, e.g. "Epoch 1/100:  5%|... [00:10<..., loss=0.512, update=20]"
+epoch_progress_pattern = re.compile(r"Epoch (\d+)/(\d+):\s+(\d+)%\|.*\[(\d+:\d+)<.*?loss=(\d+\.\d+), update=(\d+)")
 
 
 path_data = str(files("f5_tts").joinpath("../../data"))
 path_project_ckpts = str(files("f5_tts").joinpath("../../ckpts"))
 file_train = str(files("f5_tts").joinpath("train/finetune_cli.py"))
 
+# Read when the CUDA allocator first initializes, so setting it here also covers this process. Growable segments
+# limit fragmentation as inference models are loaded and freed; the training subprocess inherits it too.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
 device = (
     "cuda"
     if torch.cuda.is_available()
@@ -73,6 +96,23 @@ device = (
 )
 
 
+# Device count and properties don't change while the app runs, only query the driver once
+@lru_cache(maxsize=None)
+def get_device_count(backend):
+    return getattr(torch, backend).device_count()
+
+
+@lru_cache(maxsize=None)
+def get_device_properties(backend, index):
+    return getattr(torch, backend).get_device_properties(index)
+
+
+@lru_cache(maxsize=None)
+def get_total_gpu_memory(backend):
+    """Total memory of all the devices of the backend, in GB."""
+    return sum(get_device_properties(backend, i).total_memory for i in range(get_device_count(backend))) / (1024**3)
+
+
 # Save settings from a JSON file
 def save_settings(
     project_name,
@@ -123,6 +163,7 @@ def save_settings(
     }
     with open(file_setting, "w") as f:
         json.dump(settings, f, indent=4)
+    settings_cache[file_setting] = (os.stat(file_setting).st_mtime_ns, settings)
     return "Settings saved!"
 
 
@@ -159,8 +200,14 @@ def load_settings(project_name):
 
     # Load settings from file if it exists
     if os.path.isfile(file_setting):
-        with open(file_setting, "r") as f:
-            file_settings = json.load(f)
+        mtime = os.stat(file_setting).st_mtime_ns
+        cached = settings_cache.get(file_setting)
+        if cached is not None and cached[0] == mtime:
+            file_settings = cached[1]
+        else:
+            with open(file_setting, "r") as f:
+                file_settings = json.load(f)
+            settings_cache[file_setting] = (mtime, file_settings)
         default_settings.update(file_settings)
 
     # Return as a tuple in the correct order
@@ -190,8 +237,71 @@ def load_settings(project_name):
 # Load metadata
 def get_audio_duration(audio_path):
     """Calculate the duration mono of an audio file."""
-    audio, sample_rate = torchaudio.load(audio_path)
-    return audio.shape[1] / sample_rate
+    try:
+        info = sf.info(audio_path)
+        return info.frames / info.samplerate
+    except RuntimeError:  # format not supported by libsndfile
+        audio, sample_rate = torchaudio.load(audio_path)
+        return audio.shape[1] / sample_rate
+
+
+def compute_sil_tags(rms_list, threshold, min_interval, min_length, max_sil_kept):
+    """Return the (start, end) frame ranges of silence to cut, as an int64 array of shape (n, 2)."""
+    total_frames = rms_list.shape[0]
+    # Silent runs as [start, end) frame ranges, end being the first voiced frame after the run.
+    silent = rms_list < threshold
+    run_bounds = np.flatnonzero(np.diff(silent, prepend=False, append=False))
+    run_starts, run_ends = run_bounds[0::2].tolist(), run_bounds[1::2].tolist()
+    trailing_silence_start = None
+    if run_ends and run_ends[-1] == total_frames:
+        trailing_silence_start = run_starts.pop()
+        run_ends.pop()
+    # At most one tag per silent run, plus the trailing silence.
+    sil_tags = np.empty((len(run_starts) + 1, 2), dtype=np.int64)
+    num_tags = 0
+    clip_start = 0
+    for silence_start, i in zip(run_starts, run_ends):
+        # Skip the silence if interval is not enough or clip is too short
+        is_leading_silence = silence_start == 0 and i > max_sil_kept
+        need_slice_middle = i - silence_start >= min_interval and i - clip_start >= min_length
+        if not is_leading_silence and not need_slice_middle:
+            continue
+        # Need slicing. Record the range of silent frames to be removed.
+        if i - silence_start <= max_sil_kept:
+            pos = rms_list[silence_start : i + 1].argmin() + silence_start
+            if silence_start == 0:
+                sil_tags[num_tags] = (0, pos)
+            else:
+                sil_tags[num_tags] = (pos, pos)
+            clip_start = pos
+        elif i - silence_start <= max_sil_kept * 2:
+            pos = rms_list[i - max_sil_kept : silence_start + max_sil_kept + 1].argmin()
+            pos += i - max_sil_kept
+            pos_l = rms_list[silence_start : silence_start + max_sil_kept + 1].argmin() + silence_start
+            pos_r = rms_list[i - max_sil_kept : i + 1].argmin() + i - max_sil_kept
+            if silence_start == 0:
+                sil_tags[num_tags] = (0, pos_r)
+                clip_start = pos_r
+            else:
+                sil_tags[num_tags] = (min(pos_l, pos), max(pos_r, pos))
+                clip_start = max(pos_r, pos)
+        else:
+            pos_l = rms_list[silence_start : silence_start + max_sil_kept + 1].argmin() + silence_start
+            pos_r = rms_list[i - max_sil_kept : i + 1].argmin() + i - max_sil_kept
+            if silence_start == 0:
+                sil_tags[num_tags] = (0, pos_r)
+            else:
+                sil_tags[num_tags] = (pos_l, pos_r)
+            clip_start = pos_r
+        num_tags += 1
+    # Deal with trailing silence.
+    silence_start = trailing_silence_start
+    if silence_start is not None and total_frames - silence_start >= min_interval:
+        silence_end = min(total_frames, silence_start + max_sil_kept)
+        pos = rms_list[silence_start : silence_end + 1].argmin() + silence_start
+        sil_tags[num_tags] = (pos, total_frames + 1)
+        num_tags += 1
+    return sil_tags[:num_tags]
 
 
 class Slicer:  # https://github.com/RVC-Boss/GPT-SoVITS/blob/main/tools/slicer2.py
@@ -222,6 +332,42 @@ class Slicer:  # https://github.com/RVC-Boss/GPT-SoVITS/blob/main/tools/slicer2.
         else:
             return waveform[begin * self.hop_size : min(waveform.shape[0], end * self.hop_size)]
 
+    def _get_rms(self, samples):
+        # Centered framing, same frames as librosa.feature.rms(y=samples, frame_length=win_size, hop_length=hop_size)
+        padded = np.pad(samples, (self.win_size // 2, self.win_size // 2), mode="constant")
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.win_size)[:: self.hop_size]
+        return np.sqrt(np.square(frames, dtype=np.float32).mean(axis=1))
+
+    def _get_rms_blocks(self, blocks):
+        # Same frames as _get_rms over the concatenated blocks, keeping only the samples of unfinished frames
+        pad = np.zeros(self.win_size // 2, dtype=np.float32)
+        buffer = pad
+        list_rms = []
+        for block in chain(blocks, [pad]):
+            buffer = np.concatenate([buffer, block])
+            if buffer.shape[0] < self.win_size:
+                continue
+            frames = np.lib.stride_tricks.sliding_window_view(buffer, self.win_size)[:: self.hop_size]
+            list_rms.append(np.sqrt(np.square(frames, dtype=np.float32).mean(axis=1)))
+            buffer = buffer[frames.shape[0] * self.hop_size :]
+        return np.concatenate(list_rms)
+
+    def _get_slice_frames(self, rms_list):
+        # [begin, end) frame ranges of the chunks left between the silences to cut
+        sil_tags = compute_sil_tags(rms_list, self.threshold, self.min_interval, self.min_length, self.max_sil_kept)
+        sil_tags = sil_tags.tolist()
+        total_frames = rms_list.shape[0]
+        if len(sil_tags) == 0:
+            return [(0, total_frames)]
+        slice_frames = []
+        if sil_tags[0][0] > 0:
+            slice_frames.append((0, sil_tags[0][0]))
+        for i in range(len(sil_tags) - 1):
+            slice_frames.append((sil_tags[i][1], sil_tags[i + 1][0]))
+        if sil_tags[-1][1] < total_frames:
+            slice_frames.append((sil_tags[-1][1], total_frames))
+        return slice_frames
+
     # @timeit
     def slice(self, waveform):
         if len(waveform.shape) > 1:
@@ -229,85 +375,32 @@ class Slicer:  # https://github.com/RVC-Boss/GPT-SoVITS/blob/main/tools/slicer2.
         else:
             samples = waveform
         if samples.shape[0] <= self.min_length:
-            return [waveform]
-        rms_list = librosa.feature.rms(y=samples, frame_length=self.win_size, hop_length=self.hop_size).squeeze(0)
-        sil_tags = []
-        silence_start = None
-        clip_start = 0
-        for i, rms in enumerate(rms_list):
-            # Keep looping while frame is silent.
-            if rms < self.threshold:
-                # Record start of silent frames.
-                if silence_start is None:
-                    silence_start = i
-                continue
-            # Keep looping while frame is not silent and silence start has not been recorded.
-            if silence_start is None:
-                continue
-            # Clear recorded silence start if interval is not enough or clip is too short
-            is_leading_silence = silence_start == 0 and i > self.max_sil_kept
-            need_slice_middle = i - silence_start >= self.min_interval and i - clip_start >= self.min_length
-            if not is_leading_silence and not need_slice_middle:
-                silence_start = None
-                continue
-            # Need slicing. Record the range of silent frames to be removed.
-            if i - silence_start <= self.max_sil_kept:
-                pos = rms_list[silence_start : i + 1].argmin() + silence_start
-                if silence_start == 0:
-                    sil_tags.append((0, pos))
-                else:
-                    sil_tags.append((pos, pos))
-                clip_start = pos
-            elif i - silence_start <= self.max_sil_kept * 2:
-                pos = rms_list[i - self.max_sil_kept : silence_start + self.max_sil_kept + 1].argmin()
-                pos += i - self.max_sil_kept
-                pos_l = rms_list[silence_start : silence_start + self.max_sil_kept + 1].argmin() + silence_start
-                pos_r = rms_list[i - self.max_sil_kept : i + 1].argmin() + i - self.max_sil_kept
-                if silence_start == 0:
-                    sil_tags.append((0, pos_r))
-                    clip_start = pos_r
-                else:
-                    sil_tags.append((min(pos_l, pos), max(pos_r, pos)))
-                    clip_start = max(pos_r, pos)
-            else:
-                pos_l = rms_list[silence_start : silence_start + self.max_sil_kept + 1].argmin() + silence_start
-                pos_r = rms_list[i - self.max_sil_kept : i + 1].argmin() + i - self.max_sil_kept
-                if silence_start == 0:
-                    sil_tags.append((0, pos_r))
-                else:
-                    sil_tags.append((pos_l, pos_r))
-                clip_start = pos_r
-            silence_start = None
-        # Deal with trailing silence.
-        total_frames = rms_list.shape[0]
-        if silence_start is not None and total_frames - silence_start >= self.min_interval:
-            silence_end = min(total_frames, silence_start + self.max_sil_kept)
-            pos = rms_list[silence_start : silence_end + 1].argmin() + silence_start
-            sil_tags.append((pos, total_frames + 1))
+            return [[waveform, 0, int(samples.shape[0])]]
+        rms_list = self._get_rms(samples)
         # Apply and return slices: [chunk, start, end]
-        if len(sil_tags) == 0:
-            return [[waveform, 0, int(total_frames * self.hop_size)]]
-        else:
-            chunks = []
-            if sil_tags[0][0] > 0:
-                chunks.append([self._apply_slice(waveform, 0, sil_tags[0][0]), 0, int(sil_tags[0][0] * self.hop_size)])
-            for i in range(len(sil_tags) - 1):
-                chunks.append(
-                    [
-                        self._apply_slice(waveform, sil_tags[i][1], sil_tags[i + 1][0]),
-                        int(sil_tags[i][1] * self.hop_size),
-                        int(sil_tags[i + 1][0] * self.hop_size),
-                    ]
-                )
-            if sil_tags[-1][1] < total_frames:
-                chunks.append(
-                    [
-                        self._apply_slice(waveform, sil_tags[-1][1], total_frames),
-                        int(sil_tags[-1][1] * self.hop_size),
-                        int(total_frames * self.hop_size),
-                    ]
-                )
-            return chunks
+        return [
+            [self._apply_slice(waveform, begin, end), int(begin * self.hop_size), int(end * self.hop_size)]
+            for begin, end in self._get_slice_frames(rms_list)
+        ]
+
+    def slice_file(self, file_audio, blocksize=262144):
+        """Slice an audio file at the slicer sampling rate, decoding it block by block.
+
+        Returns the [start, end) sample ranges of the chunks, to be read from the file when needed.
+        """
+        with sf.SoundFile(file_audio) as f:
+            num_samples = f.frames
+            if num_samples <= self.min_length:
+                return [(0, num_samples)]
+            blocks = (
+                block.mean(axis=1) if block.ndim > 1 else block
+                for block in f.blocks(blocksize=blocksize, dtype="float32")
+            )
+            rms_list = self._get_rms_blocks(blocks)
+        return [
+            (begin * self.hop_size, min(num_samples, end * self.hop_size))
+            for begin, end in self._get_slice_frames(rms_list)
+        ]
 
 
 # terminal
@@ -333,8 +426,9 @@ def terminate_process_tree(pid, including_parent=True):
 
 def terminate_process(pid):
     if system == "Windows":
-        cmd = f"taskkill /t /f /pid {pid}"
-        os.system(cmd)
+        subprocess.run(
+            ["taskkill", "/T", "/F", "/PID", str(pid)], creationflags=subprocess.CREATE_NO_WINDOW, check=False
+        )
     else:
         terminate_process_tree(pid)
 
@@ -362,15 +456,10 @@ def start_training(
     logger,
     ch_8bit_adam,
 ):
-    global training_process, tts_api, stop_signal
-
-    if tts_api is not None:
-        if tts_api is not None:
-            del tts_api
+    global training_process, stop_signal
 
-        gc.collect()
-        torch.cuda.empty_cache()
-        tts_api = None
+    # Free the cached inference models before training claims the GPU
+    clear_tts_api_cache()
 
     path_project = _safe_project_path(path_data, dataset_name)
 
@@ -391,7 +480,26 @@ def start_training(
     if training_process is not None:
         return "Train run already!", gr.update(interactive=False), gr.update(interactive=True)
 
-    yield "start train", gr.update(interactive=False), gr.update(interactive=False)
+    # The trainer picks torch.load or safetensors from the extension, catch a mismatch before launching
+    if finetune and file_checkpoint_train != "":
+        if not os.path.isfile(file_checkpoint_train):
+            yield f"There is no file {file_checkpoint_train}", gr.update(interactive=True), gr.update(interactive=False)
+            return
+        checkpoint_format = get_checkpoint_format(file_checkpoint_train, os.stat(file_checkpoint_train).st_mtime_ns)
+        if checkpoint_format is None or not file_checkpoint_train.endswith(f".{checkpoint_format}"):
+            yield (
+                f"The pretrained checkpoint {file_checkpoint_train} is not a valid .pt or .safetensors file",
+                gr.update(interactive=True),
+                gr.update(interactive=False),
+            )
+            return
+        yield (
+            f"start train (pretrained checkpoint format : {checkpoint_format})",
+            gr.update(interactive=False),
+            gr.update(interactive=False),
+        )
+    else:
+        yield "start train", gr.update(interactive=False), gr.update(interactive=False)
 
     # Command to run the training script with the specified arguments
 
@@ -482,12 +590,12 @@ def start_training(
             training_process.wait()
         else:
 
-            def stream_output(pipe, output_queue):
+            def stream_output(pipe, output_queue, is_stderr):
                 try:
                     for line in iter(pipe.readline, ""):
-                        output_queue.put(line)
+                        output_queue.put((is_stderr, line))
                 except Exception as e:
-                    output_queue.put(f"Error reading pipe: {str(e)}")
+                    output_queue.put((True, f"Error reading pipe: {str(e)}"))
                 finally:
                     pipe.close()
 
@@ -499,11 +607,12 @@ def start_training(
             )
             yield "Training started ...", gr.update(interactive=False), gr.update(interactive=True)
 
-            stdout_queue = queue.Queue()
-            stderr_queue = queue.Queue()
+            # Both pipes feed one queue, so the loop below can block on it instead of polling.
+            # (Reader threads rather than selectors, which can't wait on pipes on Windows.)
+            output_queue = queue.Queue()
 
-            stdout_thread = threading.Thread(target=stream_output, args=(training_process.stdout, stdout_queue))
-            stderr_thread = threading.Thread(target=stream_output, args=(training_process.stderr, stderr_queue))
+            stdout_thread = threading.Thread(target=stream_output, args=(training_process.stdout, output_queue, False))
+            stderr_thread = threading.Thread(target=stream_output, args=(training_process.stderr, output_queue, True))
             stdout_thread.daemon = True
             stderr_thread.daemon = True
             stdout_thread.start()
@@ -518,47 +627,12 @@ def start_training(
                     yield "Training stopped by user.", gr.update(interactive=True), gr.update(interactive=False)
                     break
 
-                process_status = training_process.poll()
-
-                # Handle stdout
                 try:
-                    while True:
-                        output = stdout_queue.get_nowait()
-                        print(output, end="")
-                        match = re.search(
-                            r"Epoch (\d+)/(\d+):\s+(\d+)%\|.*\[(\d+:\d+)<.*?loss=(\d+\.\d+), update=(\d+)", output
-                        )
-                        if match:
-                            current_epoch = match.group(1)
-                            total_epochs = match.group(2)
-                            percent_complete = match.group(3)
-                            elapsed_time = match.group(4)
-                            loss = match.group(5)
-                            current_update = match.group(6)
-                            message = (
-                                f"Epoch: {current_epoch}/{total_epochs}, "
-                                f"Progress: {percent_complete}%, "
-                                f"Elapsed Time: {elapsed_time}, "
-                                f"Loss: {loss}, "
-                                f"Update: {current_update}"
-                            )
-                            yield message, gr.update(interactive=False), gr.update(interactive=True)
-                        elif output.strip():
-                            yield output, gr.update(interactive=False), gr.update(interactive=True)
+                    is_stderr, output = output_queue.get(timeout=0.5)
                 except queue.Empty:
-                    pass
-
-                # Handle stderr
-                try:
-                    while True:
-                        error_output = stderr_queue.get_nowait()
-                        print(error_output, end="")
-                        if error_output.strip():
-                            yield f"{error_output.strip()}", gr.update(interactive=False), gr.update(interactive=True)
-                except queue.Empty:
-                    pass
-
-                if process_status is not None and stdout_queue.empty() and stderr_queue.empty():
+                    process_status = training_process.poll()
+                    if process_status is None or stdout_thread.is_alive() or stderr_thread.is_alive():
+                        continue
                     if process_status != 0:
                         yield (
                             f"Process crashed with exit code {process_status}!",
@@ -573,8 +647,33 @@ def start_training(
                         )
                     break
 
-                # Small sleep to prevent CPU thrashing
-                time.sleep(0.1)
+                print(output, end="")
+
+                # Handle stderr
+                if is_stderr:
+                    if output.strip():
+                        yield f"{output.strip()}", gr.update(interactive=False), gr.update(interactive=True)
+                    continue
+
+                # Handle stdout
+                match = epoch_progress_pattern.search(output) if "Epoch " in output else None
+                if match:
+                    current_epoch = match.group(1)
+                    total_epochs = match.group(2)
+                    percent_complete = match.group(3)
+                    elapsed_time = match.group(4)
+                    loss = match.group(5)
+                    current_update = match.group(6)
+                    message = (
+                        f"Epoch: {current_epoch}/{total_epochs}, "
+                        f"Progress: {percent_complete}%, "
+                        f"Elapsed Time: {elapsed_time}, "
+                        f"Loss: {loss}, "
+                        f"Update: {current_update}"
+                    )
+                    yield message, gr.update(interactive=False), gr.update(interactive=True)
+                elif output.strip():
+                    yield output, gr.update(interactive=False), gr.update(interactive=True)
 
             # Clean up
             training_process.stdout.close()
@@ -609,30 +708,96 @@ def stop_training():
 
 
 def get_list_projects():
+    global projects_cache
+
+    # the data folder mtime changes whenever a project folder is added or removed
+    mtime = os.stat(path_data).st_mtime_ns
+    if projects_cache is not None and projects_cache[0] == mtime:
+        return list(projects_cache[1]), projects_cache[2]
+
     project_list = []
-    for folder in os.listdir(path_data):
-        path_folder = os.path.join(path_data, folder)
-        if not os.path.isdir(path_folder):
-            continue
-        folder = folder.lower()
-        if folder == "emilia_zh_en_pinyin":
-            continue
-        project_list.append(folder)
+    with os.scandir(path_data) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            folder = entry.name.lower()
+            if folder == "emilia_zh_en_pinyin":
+                continue
+            project_list.append(folder)
 
     projects_selelect = None if not project_list else project_list[-1]
+    projects_cache = (mtime, project_list, projects_selelect)
 
-    return project_list, projects_selelect
+    return list(project_list), projects_selelect
 
 
 def create_data_project(name, tokenizer_type):
+    global projects_cache
+
     name += "_" + tokenizer_type
     project_dir = _safe_project_path(path_data, name)
     os.makedirs(project_dir, exist_ok=True)
     os.makedirs(os.path.join(project_dir, "dataset"), exist_ok=True)
+    # The folder was just added, don't rely on the data folder mtime (coarse on FAT/exFAT, some NFS mounts)
+    projects_cache = None
     project_list, projects_selelect = get_list_projects()
     return gr.update(choices=project_list, value=name)
 
 
+def load_and_slice_audio(file_audio, slicer):
+    """Slice an audio file on silences, returns (source, ranges) to read its 24 kHz mono chunks with read_audio_chunk.
+
+    24 kHz files are sliced block by block and left on disk, others are decoded and resampled in memory.
+    """
+    try:
+        sample_rate = sf.info(file_audio).samplerate
+    except RuntimeError:  # format not supported by libsndfile
+        sample_rate = None
+    if sample_rate == 24000:
+        return file_audio, slicer.slice_file(file_audio)
+
+    if sample_rate is not None:
+        audio, sr = sf.read(file_audio, dtype="float32", always_2d=False)
+    else:
+        audio, sr = librosa.load(file_audio, sr=None, mono=True)
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if sr != 24000:
+        audio = torchaudio.functional.resample(torch.from_numpy(audio), sr, 24000).numpy()
+
+    return audio, [(start, end) for chunk, start, end in slicer.slice(audio)]
+
+
+def read_audio_chunk(source, start, end, alpha=0.5, _max=1.0):
+    """Read samples [start, end) of a 24 kHz mono array or audio file and normalize their volume."""
+    if isinstance(source, np.ndarray):
+        chunk = source[start:end]
+    else:
+        chunk, _ = sf.read(source, start=start, stop=end, dtype="float32", always_2d=False)
+        if chunk.ndim == 2:
+            chunk = chunk.mean(axis=1)
+
+    tmp_max = np.abs(chunk).max()
+    if tmp_max > 0:
+        # (chunk / tmp_max * (_max * alpha)) + (1 - alpha) * chunk, applied in place as a single gain
+        gain = _max * alpha / tmp_max + (1 - alpha)
+        if tmp_max > 1:
+            gain /= tmp_max
+        np.multiply(chunk, np.float32(gain), out=chunk)
+    return chunk
+
+
+def map_prefetch(executor, fn, items, prefetch):
+    """Like executor.map, but with at most `prefetch` tasks in flight so results don't pile up in memory."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= prefetch:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
 def transcribe_all(name_project, audio_files, language, user=False, progress=gr.Progress()):
     path_project = _safe_project_path(path_data, name_project)
     path_dataset = os.path.join(path_project, "dataset")
@@ -652,49 +817,48 @@ def transcribe_all(name_project, audio_files, language, user=False, progress=gr.
     os.makedirs(path_project_wavs, exist_ok=True)
 
     if user:
-        file_audios = [
-            file
-            for format in ("*.wav", "*.ogg", "*.opus", "*.mp3", "*.flac")
-            for file in glob(os.path.join(path_dataset, format))
-        ]
+        audio_extensions = frozenset((".wav", ".ogg", ".opus", ".mp3", ".flac"))
+        file_audios = []
+        if os.path.isdir(path_dataset):
+            with os.scandir(path_dataset) as entries:
+                file_audios = [
+                    entry.path
+                    for entry in entries
+                    if entry.is_file() and os.path.splitext(entry.name)[1].lower() in audio_extensions
+                ]
         if file_audios == []:
             return "No audio file was found in the dataset."
     else:
         file_audios = audio_files
 
-    alpha = 0.5
-    _max = 1.0
     slicer = Slicer(24000)
+    # A resampled file is held whole until transcribed, so keep only a few decoded ahead of the ASR model
+    num_workers = min(4, max(1, (os.cpu_count() or 1) // 2))
 
     num = 0
     error_num = 0
-    data = ""
-    for file_audio in progress.tqdm(file_audios, desc="transcribe files", total=len((file_audios))):
-        audio, _ = librosa.load(file_audio, sr=24000, mono=True)
-
-        list_slicer = slicer.slice(audio)
-        for chunk, start, end in progress.tqdm(list_slicer, total=len(list_slicer), desc="slicer files"):
-            name_segment = os.path.join(f"segment_{num}")
-            file_segment = os.path.join(path_project_wavs, f"{name_segment}.wav")
-
-            tmp_max = np.abs(chunk).max()
-            if tmp_max > 1:
-                chunk /= tmp_max
-            chunk = (chunk / tmp_max * (_max * alpha)) + (1 - alpha) * chunk
-            wavfile.write(file_segment, 24000, (chunk * 32767).astype(np.int16))
-
-            try:
-                text = transcribe(file_segment, language)
-                text = text.strip()
+    # Slice the next files in worker threads while the ASR model transcribes on this one.
+    with open(file_metadata, "w", encoding="utf-8-sig") as f, ThreadPoolExecutor(max_workers=num_workers) as executor:
+        list_files_sliced = map_prefetch(
+            executor, partial(load_and_slice_audio, slicer=slicer), file_audios, prefetch=num_workers + 1
+        )
+        for source, list_ranges in progress.tqdm(list_files_sliced, desc="transcribe files", total=len(file_audios)):
+            for start, end in progress.tqdm(list_ranges, total=len(list_ranges), desc="slicer files"):
+                chunk = read_audio_chunk(source, start, end)
+                name_segment = os.path.join(f"segment_{num}")
+                file_segment = os.path.join(path_project_wavs, f"{name_segment}.wav")
 
-                data += f"{name_segment}|{text}\n"
+                try:
+                    # The ASR pipeline takes the waveform in memory, no need to read back the written file
+                    text = transcribe({"raw": chunk, "sampling_rate": 24000}, language)
+                    text = text.strip()
 
-                num += 1
-            except:  # noqa: E722
-                error_num += 1
+                    sf.write(file_segment, chunk, 24000, subtype="PCM_16")
+                    f.write(f"{name_segment}|{text}\n")
 
-    with open(file_metadata, "w", encoding="utf-8-sig") as f:
-        f.write(data)
+                    num += 1
+                except:  # noqa: E722
+                    error_num += 1
 
     if error_num != []:
         error_text = f"\nerror files : {error_num}"
@@ -742,6 +906,23 @@ def get_correct_audio_path(
     return file_audio
 
 
+def probe_metadata_line(line, path_project_wavs):
+    """Resolve the audio file and duration of a metadata line, returns (file_audio, text, duration, error)."""
+    name_audio, text = line.split("|")
+    file_audio = get_correct_audio_path(name_audio, path_project_wavs)
+
+    if not os.path.isfile(file_audio):
+        return file_audio, text, None, "error path"
+
+    try:
+        duration = get_audio_duration(file_audio)
+    except Exception as e:
+        print(f"Error processing {file_audio}: {e}")
+        return file_audio, text, None, "duration"
+
+    return file_audio, text, duration, None
+
+
 def create_metadata(name_project, ch_tokenizer, progress=gr.Progress()):
     path_project = _safe_project_path(path_data, name_project)
     path_project_wavs = os.path.join(path_project, "wavs")
@@ -760,28 +941,18 @@ def create_metadata(name_project, ch_tokenizer, progress=gr.Progress()):
     text_list = []
     duration_list = []
 
-    count = data.split("\n")
+    lines = [line for line in data.split("\n") if len(line.split("|")) == 2]
     lenght = 0
-    result = []
     error_files = []
     text_vocab_set = set()
-    for line in progress.tqdm(data.split("\n"), total=count):
-        sp_line = line.split("|")
-        if len(sp_line) != 2:
-            continue
-        name_audio, text = sp_line[:2]
-
-        file_audio = get_correct_audio_path(name_audio, path_project_wavs)
-
-        if not os.path.isfile(file_audio):
-            error_files.append([file_audio, "error path"])
-            continue
-
-        try:
-            duration = get_audio_duration(file_audio)
-        except Exception as e:
-            error_files.append([file_audio, "duration"])
-            print(f"Error processing {file_audio}: {e}")
+    # Path resolution and header reads are I/O bound, overlap them across files.
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list_probes = executor.map(partial(probe_metadata_line, path_project_wavs=path_project_wavs), lines)
+        list_probes = list(progress.tqdm(list_probes, total=len(lines), desc="read audio files"))
+
+    for file_audio, text, duration, error in list_probes:
+        if error is not None:
+            error_files.append([file_audio, error])
             continue
 
         if duration < 1 or duration > 30:
@@ -794,34 +965,38 @@ def create_metadata(name_project, ch_tokenizer, progress=gr.Progress()):
             error_files.append([file_audio, "very short text length 3"])
             continue
 
-        text = text.strip()
-        text = convert_char_to_pinyin([text], polyphone=True)[0]
-
         audio_path_list.append(file_audio)
         duration_list.append(duration)
-        text_list.append(text)
-
-        result.append({"audio_path": file_audio, "text": text, "duration": duration})
-        if ch_tokenizer:
-            text_vocab_set.update(list(text))
+        text_list.append(text.strip())
 
         lenght += duration
 
     if duration_list == []:
         return f"Error: No audio files found in the specified path : {path_project_wavs}", ""
 
+    text_list = convert_char_to_pinyin(text_list, polyphone=True)
+    if ch_tokenizer:
+        text_vocab_set.update(c for text in text_list for c in text)
+
     min_second = round(min(duration_list), 2)
     max_second = round(max(duration_list), 2)
 
+    batch_size = 4096
     with ArrowWriter(path=file_raw) as writer:
-        for line in progress.tqdm(result, total=len(result), desc="prepare data"):
-            writer.write(line)
+        for i in progress.tqdm(range(0, len(text_list), batch_size), desc="prepare data"):
+            writer.write_batch(
+                {
+                    "audio_path": audio_path_list[i : i + batch_size],
+                    "text": text_list[i : i + batch_size],
+                    "duration": duration_list[i : i + batch_size],
+                }
+            )
         writer.finalize()
 
     with open(file_duration, "w") as f:
-        json.dump({"duration": duration_list}, f, ensure_ascii=False)
+        # one-shot dumps goes through the C encoder, json.dump writes chunk by chunk
+        f.write(json.dumps({"duration": duration_list}, ensure_ascii=False))
 
-    new_vocal = ""
     if not ch_tokenizer:
         if not os.path.isfile(file_vocab):
             file_vocab_finetune = os.path.join(path_data, "Emilia_ZH_EN_pinyin/vocab.txt")
@@ -834,12 +1009,12 @@ def create_metadata(name_project, ch_tokenizer, progress=gr.Progress()):
             for i, char in enumerate(f):
                 vocab_char_map[char[:-1]] = i
         vocab_size = len(vocab_char_map)
+        new_vocal = ""
 
     else:
+        new_vocal = "".join(vocab + "\n" for vocab in sorted(text_vocab_set))
         with open(file_vocab, "w", encoding="utf-8-sig") as f:
-            for vocab in sorted(text_vocab_set):
-                f.write(vocab + "\n")
-                new_vocal += vocab + "\n"
+            f.write(new_vocal)
         vocab_size = len(text_vocab_set)
 
     if error_files != []:
@@ -857,6 +1032,16 @@ def check_user(value):
     return gr.update(visible=not value), gr.update(visible=value)
 
 
+# (max, count, sum) of a duration.json, kept until the file changes so repeated Calculate clicks skip the parse
+@lru_cache(maxsize=4)
+def load_duration_stats(file_duration, mtime):
+    with open(file_duration, "r") as file:
+        data = json.load(file)
+
+    duration_list = np.asarray(data["duration"], dtype=np.float64)
+    return float(duration_list.max()), int(duration_list.size), float(duration_list.sum())
+
+
 def calculate_train(
     name_project,
     epochs,
@@ -883,27 +1068,16 @@ def calculate_train(
             "project not found !",
         )
 
-    with open(file_duration, "r") as file:
-        data = json.load(file)
-
-    duration_list = data["duration"]
-    max_sample_length = max(duration_list) * sampling_rate / hop_length
-    total_samples = len(duration_list)
-    total_duration = sum(duration_list)
+    max_duration, total_samples, total_duration = load_duration_stats(file_duration, os.stat(file_duration).st_mtime_ns)
+    max_sample_length = max_duration * sampling_rate / hop_length
 
-    if torch.cuda.is_available():
-        gpu_count = torch.cuda.device_count()
-        total_memory = 0
-        for i in range(gpu_count):
-            gpu_properties = torch.cuda.get_device_properties(i)
-            total_memory += gpu_properties.total_memory / (1024**3)  # in GB
-    elif torch.xpu.is_available():
-        gpu_count = torch.xpu.device_count()
-        total_memory = 0
-        for i in range(gpu_count):
-            gpu_properties = torch.xpu.get_device_properties(i)
-            total_memory += gpu_properties.total_memory / (1024**3)
-    elif torch.backends.mps.is_available():
+    if device == "cuda":
+        gpu_count = get_device_count("cuda")
+        total_memory = get_total_gpu_memory("cuda")
+    elif device == "xpu":
+        gpu_count = get_device_count("xpu")
+        total_memory = get_total_gpu_memory("xpu")
+    elif device == "mps":
         gpu_count = 1
         total_memory = psutil.virtual_memory().available / (1024**3)
 
@@ -948,7 +1122,15 @@ def calculate_train(
 
 def prune_checkpoint(checkpoint_path: str, new_checkpoint_path: str, save_ema: bool, safetensors: bool) -> str:
     try:
-        checkpoint = torch.load(checkpoint_path, weights_only=True)
+        if safetensors:
+            new_checkpoint_path = new_checkpoint_path.replace(".pt", ".safetensors")
+        else:
+            new_checkpoint_path = new_checkpoint_path.replace(".safetensors", ".pt")
+
+        # mmap: tensors are paged in from the file as they are written out, not copied into memory upfront.
+        # Not when pruning in place, as saving truncates the mapped file before the tensors are read (SIGBUS).
+        in_place = os.path.realpath(checkpoint_path) == os.path.realpath(new_checkpoint_path)
+        checkpoint = torch.load(checkpoint_path, map_location="cpu", weights_only=True, mmap=not in_place)
         print("Original Checkpoint Keys:", checkpoint.keys())
 
         to_retain = "ema_model_state_dict" if save_ema else "model_state_dict"
@@ -957,35 +1139,38 @@ def prune_checkpoint(checkpoint_path: str, new_checkpoint_path: str, save_ema: b
         except KeyError:
             return f"{to_retain} not found in the checkpoint."
 
+        # Drop the optimizer and the other state dict so only the retained weights stay referenced
+        del checkpoint
+
+        start_time = time.perf_counter()
         if safetensors:
-            new_checkpoint_path = new_checkpoint_path.replace(".pt", ".safetensors")
-            save_file(model_state_dict_to_retain, new_checkpoint_path)
+            save_file(model_state_dict_to_retain, new_checkpoint_path, metadata={"ema": str(save_ema)})
         else:
-            new_checkpoint_path = new_checkpoint_path.replace(".safetensors", ".pt")
             new_checkpoint = {"ema_model_state_dict": model_state_dict_to_retain}
             torch.save(new_checkpoint, new_checkpoint_path)
+        elapsed = time.perf_counter() - start_time
+        # The new file may land in a project ckpts folder whose mtime is too coarse to notice it
+        scan_checkpoints.cache_clear()
+        size_mb = os.path.getsize(new_checkpoint_path) / (1024**2)
 
-        return f"New checkpoint saved at: {new_checkpoint_path}"
+        return (
+            f"New checkpoint saved at: {new_checkpoint_path}\n"
+            f"size : {size_mb:.1f} MB, written in {elapsed:.2f} s ({size_mb / max(elapsed, 1e-6):.1f} MB/s)"
+        )
 
     except Exception as e:
         return f"An error occurred: {e}"
 
 
 def expand_model_embeddings(ckpt_path, new_ckpt_path, num_new_tokens=42):
-    seed = 666
-    random.seed(seed)
-    os.environ["PYTHONHASHSEED"] = str(seed)
-    torch.manual_seed(seed)
-    torch.cuda.manual_seed(seed)
-    torch.cuda.manual_seed_all(seed)
-    torch.backends.cudnn.deterministic = True
-    torch.backends.cudnn.benchmark = False
+    # Local generator keeps the new rows reproducible without touching the process-wide RNG / cuDNN state
+    generator = torch.Generator().manual_seed(666)
 
     if ckpt_path.endswith(".safetensors"):
         ckpt = load_file(ckpt_path, device="cpu")
         ckpt = {"ema_model_state_dict": ckpt}
     elif ckpt_path.endswith(".pt"):
-        ckpt = torch.load(ckpt_path, map_location="cpu")
+        ckpt = torch.load(ckpt_path, map_location="cpu", weights_only=True, mmap=True)
 
     ema_sd = ckpt.get("ema_model_state_dict", {})
     embed_key_ema = "ema_model.transformer.text_embed.text_embed.weight"
@@ -996,10 +1181,8 @@ def expand_model_embeddings(ckpt_path, new_ckpt_path, num_new_tokens=42):
     vocab_new = vocab_old + num_new_tokens
 
     def expand_embeddings(old_embeddings):
-        new_embeddings = torch.zeros((vocab_new, embed_dim))
-        new_embeddings[:vocab_old] = old_embeddings
-        new_embeddings[vocab_old:] = torch.randn((num_new_tokens, embed_dim))
-        return new_embeddings
+        new_rows = torch.randn((num_new_tokens, embed_dim), generator=generator).to(old_embeddings.dtype)
+        return torch.cat([old_embeddings, new_rows], dim=0)
 
     ema_sd[embed_key_ema] = expand_embeddings(ema_sd[embed_key_ema])
 
@@ -1011,8 +1194,16 @@ def expand_model_embeddings(ckpt_path, new_ckpt_path, num_new_tokens=42):
     return vocab_new
 
 
+# Base vocab shared by vocab_check / vocab_extend, re-read only when the file mtime changes
+@lru_cache(maxsize=4)
+def load_base_vocab(file_vocab, mtime):
+    with open(file_vocab, "r", encoding="utf-8-sig") as f:
+        vocab = tuple(f.read().split("\n"))
+    return vocab, frozenset(vocab)
+
+
 def vocab_count(text):
-    return str(len(text.split(",")))
+    return "0" if not text else str(text.count(",") + 1)
 
 
 def vocab_extend(project_name, symbols, model_type):
@@ -1031,30 +1222,27 @@ def vocab_extend(project_name, symbols, model_type):
     if symbols == []:
         return "Symbols to extend not found."
 
-    with open(file_vocab, "r", encoding="utf-8-sig") as f:
-        data = f.read()
-        vocab = data.split("\n")
-    vocab_check = set(vocab)
+    vocab, vocab_check = load_base_vocab(file_vocab, os.stat(file_vocab).st_mtime_ns)
 
     miss_symbols = []
+    seen_symbols = set(vocab_check)
     for item in symbols:
         item = item.replace(" ", "")
-        if item in vocab_check:
+        if item in seen_symbols:
             continue
+        seen_symbols.add(item)
         miss_symbols.append(item)
 
     if miss_symbols == []:
         return "Symbols are okay no need to extend."
 
     size_vocab = len(vocab)
-    vocab.pop()
-    for item in miss_symbols:
-        vocab.append(item)
-
-    vocab.append("")
+    # Keep the base order and append the new symbols, dropping the empty entry left by a trailing newline
+    tokens = vocab[:-1] if vocab and vocab[-1] == "" else vocab
 
+    # One token per line, written through the buffered file instead of joining a single big string
     with open(file_vocab_project, "w", encoding="utf-8") as f:
-        f.write("\n".join(vocab))
+        f.writelines(f"{v}\n" for v in chain(tokens, miss_symbols))
 
     if model_type == "F5TTS_v1_Base":
         ckpt_path = str(cached_path("hf://SWivid/F5-TTS/F5TTS_v1_Base/model_1250000.safetensors"))
@@ -1088,32 +1276,29 @@ def vocab_check(project_name, tokenizer_type):
     if not os.path.isfile(file_vocab):
         return f"the file {file_vocab} not found !", ""
 
-    with open(file_vocab, "r", encoding="utf-8-sig") as f:
-        data = f.read()
-        vocab = data.split("\n")
-        vocab = set(vocab)
+    _, vocab = load_base_vocab(file_vocab, os.stat(file_vocab).st_mtime_ns)
 
     if not os.path.isfile(file_metadata):
         return f"the file {file_metadata} not found !", ""
 
+    text_list = []
     with open(file_metadata, "r", encoding="utf-8-sig") as f:
-        data = f.read()
-
-    miss_symbols = []
-    miss_symbols_keep = {}
-    for item in data.split("\n"):
-        sp = item.split("|")
-        if len(sp) != 2:
-            continue
+        for line in f:
+            sp = line.rstrip("\n").split("|")
+            if len(sp) != 2:
+                continue
+            text_list.append(sp[1].strip())
 
-        text = sp[1].strip()
-        if tokenizer_type == "pinyin":
-            text = convert_char_to_pinyin([text], polyphone=True)[0]
+    if tokenizer_type == "pinyin":
+        text_list = convert_char_to_pinyin(text_list, polyphone=True)
 
+    miss_symbols = []
+    seen_symbols = set(vocab)
+    for text in text_list:
         for t in text:
-            if t not in vocab and t not in miss_symbols_keep:
+            if t not in seen_symbols:
+                seen_symbols.add(t)
                 miss_symbols.append(t)
-                miss_symbols_keep[t] = t
 
     if miss_symbols == []:
         vocab_miss = ""
@@ -1132,12 +1317,27 @@ def get_random_sample_prepare(project_name):
     if not os.path.isfile(file_arrow):
         return "", None
     dataset = Dataset_.from_file(file_arrow)
-    random_sample = dataset.shuffle(seed=random.randint(0, 1000)).select([0])
-    text = "[" + " , ".join(["' " + t + " '" for t in random_sample["text"][0]]) + "]"
-    audio_path = random_sample["audio_path"][0]
+    if len(dataset) == 0:
+        return "", None
+    random_sample = dataset[random.randrange(len(dataset))]
+    text = "[" + " , ".join(["' " + t + " '" for t in random_sample["text"]]) + "]"
+    audio_path = random_sample["audio_path"]
     return text, audio_path
 
 
+# Parsed (audio, text) rows of a metadata.csv, kept until the file changes so repeated random picks skip the parse
+@lru_cache(maxsize=4)
+def load_metadata_samples(file_metadata, mtime):
+    samples = []
+    with open(file_metadata, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            sp = line.rstrip("\n").split("|")
+            if len(sp) != 2:
+                continue
+            samples.append((sp[0], sp[1]))
+    return tuple(samples)
+
+
 def get_random_sample_transcribe(project_name):
     name_project = project_name
     path_project = _safe_project_path(path_data, name_project)
@@ -1145,26 +1345,16 @@ def get_random_sample_transcribe(project_name):
     if not os.path.isfile(file_metadata):
         return "", None
 
-    data = ""
-    with open(file_metadata, "r", encoding="utf-8-sig") as f:
-        data = f.read()
-
-    list_data = []
-    for item in data.split("\n"):
-        sp = item.split("|")
-        if len(sp) != 2:
-            continue
-
-        # fixed audio when it is absolute
-        file_audio = get_correct_audio_path(sp[0], os.path.join(path_project, "wavs"))
-        list_data.append([file_audio, sp[1]])
-
-    if list_data == []:
+    samples = load_metadata_samples(file_metadata, os.stat(file_metadata).st_mtime_ns)
+    if not samples:
         return "", None
 
-    random_item = random.choice(list_data)
+    random_item = random.choice(samples)
+
+    # fixed audio when it is absolute
+    file_audio = get_correct_audio_path(random_item[0], os.path.join(path_project, "wavs"))
 
-    return random_item[1], random_item[0]
+    return random_item[1], file_audio
 
 
 def get_random_sample_infer(project_name):
@@ -1176,11 +1366,74 @@ def get_random_sample_infer(project_name):
     )
 
 
+def load_tts_api(exp_name, file_checkpoint, vocab_file, device_test, use_ema, use_compile=False, precision="auto"):
+    print("update >> ", device_test, file_checkpoint, use_ema, use_compile, precision)
+    tts_api = F5TTS(
+        model=exp_name, ckpt_file=file_checkpoint, vocab_file=vocab_file, device=device_test, use_ema=use_ema
+    )
+
+    # "auto" keeps the loader's choice (fp16 on CUDA with compute capability 7+, fp32 otherwise),
+    # the vocoder stays in fp32 either way since the sampled mel is cast back before decoding
+    if precision != "auto":
+        tts_api.ema_model.to({"fp32": torch.float32, "fp16": torch.float16, "bf16": torch.bfloat16}[precision])
+
+    if use_compile:
+        # Default mode, not "reduce-overhead": DiT caches the text embedding across NFE steps, and CUDA graph
+        # replays would overwrite that cached output. Each new shape compiles once, so the first click is slower.
+        tts_api.ema_model.transformer = torch.compile(tts_api.ema_model.transformer)
+
+    return tts_api
+
+
+def release_tts_api_memory():
+    gc.collect()
+    if device == "cuda":
+        torch.cuda.empty_cache()
+
+
+def get_tts_api(*args):
+    # Held while loading too, so a clear from start_training can't slip in before the new model is cached
+    with tts_api_lock:
+        tts_api = tts_api_cache.get(args)
+        if tts_api is not None:
+            return tts_api
+
+        # One model per device (args[3] is device_test), so e.g. the CPU model used during training
+        # and the GPU model stay warm side by side without ever holding two models in VRAM
+        stale = [key for key in tts_api_cache if key[3] == args[3]]
+        for key in stale:
+            del tts_api_cache[key]
+        if stale:
+            release_tts_api_memory()
+
+        tts_api = load_tts_api(*args)
+        tts_api_cache[args] = tts_api
+        return tts_api
+
+
+def clear_tts_api_cache():
+    with tts_api_lock:
+        if tts_api_cache:
+            tts_api_cache.clear()
+            release_tts_api_memory()
+
+
 def infer(
-    project, file_checkpoint, exp_name, ref_text, ref_audio, gen_text, nfe_step, use_ema, speed, seed, remove_silence
+    project,
+    file_checkpoint,
+    exp_name,
+    ref_text,
+    ref_audio,
+    gen_text,
+    nfe_step,
+    use_ema,
+    speed,
+    seed,
+    remove_silence,
+    use_compile=False,
+    precision="auto",
+    progress=gr.Progress(track_tqdm=True),
 ):
-    global last_checkpoint, last_device, tts_api, last_ema
-
     if not os.path.isfile(file_checkpoint):
         return None, "checkpoint not found!"
 
@@ -1189,23 +1442,8 @@ def infer(
     else:
         device_test = None
 
-    if last_checkpoint != file_checkpoint or last_device != device_test or last_ema != use_ema or tts_api is None:
-        if last_checkpoint != file_checkpoint:
-            last_checkpoint = file_checkpoint
-
-        if last_device != device_test:
-            last_device = device_test
-
-        if last_ema != use_ema:
-            last_ema = use_ema
-
-        vocab_file = os.path.join(path_data, project, "vocab.txt")
-
-        tts_api = F5TTS(
-            model=exp_name, ckpt_file=file_checkpoint, vocab_file=vocab_file, device=device_test, use_ema=use_ema
-        )
-
-        print("update >> ", device_test, file_checkpoint, use_ema)
+    vocab_file = os.path.join(path_data, project, "vocab.txt")
+    tts_api = get_tts_api(exp_name, file_checkpoint, vocab_file, device_test, use_ema, use_compile, precision)
 
     if seed == -1:  # -1 used for random
         seed = None
@@ -1220,37 +1458,78 @@ def infer(
             remove_silence=remove_silence,
             file_wave=f.name,
             seed=seed,
+            progress=progress,
         )
         return f.name, tts_api.device, str(tts_api.seed)
 
 
+# Model calls run on one dedicated thread so GPU work is serialized outside the Gradio workers
+gpu_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="f5tts-gpu")
+
+
+# wraps() exposes infer's signature so Gradio injects the gr.Progress tracker; the copied context carries it
+# over to the worker thread, and the three outputs are only sent once the result is ready
+@wraps(infer)
+async def infer_async(*args, **kwargs):
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(gpu_executor, partial(context.run, infer, *args, **kwargs))
+
+
+# Format of a checkpoint from its first bytes, cached until the file changes
+@lru_cache(maxsize=8)
+def get_checkpoint_format(file_checkpoint, mtime):
+    with open(file_checkpoint, "rb") as f:
+        header = f.read(9)
+    if len(header) == 9 and header[8:9] == b"{":  # u64 little-endian header size then the JSON header
+        return "safetensors"
+    if header.startswith(b"PK\x03\x04") or header.startswith(b"\x80"):  # torch zip archive or legacy pickle
+        return "pt"
+    return None
+
+
 def check_finetune(finetune):
     return gr.update(interactive=finetune), gr.update(interactive=finetune), gr.update(interactive=finetune)
 
 
+# The folder mtime changes whenever a file is added or removed, so it's passed to invalidate the cached scans
+@lru_cache(maxsize=32)
+def scan_checkpoints(path_ckpts, mtime):
+    # Separate pretrained, regular and last checkpoints in a single pass
+    pretrained_checkpoints, regular_checkpoints, last_checkpoint = [], [], []
+    with os.scandir(path_ckpts) as it:
+        for entry in it:
+            if not entry.name.endswith(".pt"):
+                continue
+            if "pretrained_" in entry.name:
+                pretrained_checkpoints.append(entry.path)
+            elif "model_last.pt" in entry.name:
+                last_checkpoint.append(entry.path)
+            else:
+                regular_checkpoints.append(entry.path)
+
+    # Sort regular checkpoints by number
+    regular_checkpoints.sort(key=lambda x: int(checkpoint_number_pattern.search(os.path.basename(x)).group(1)))
+
+    # Combine in order: pretrained, regular, last
+    return tuple(pretrained_checkpoints + regular_checkpoints + last_checkpoint)
+
+
+@lru_cache(maxsize=32)
+def scan_samples(path_samples, mtime):
+    files_audios = glob(os.path.join(path_samples, "*.wav"))
+    files_audios.sort(key=lambda x: int(checkpoint_number_pattern.search(os.path.basename(x)).group(1)))
+
+    return tuple(item.replace("_gen.wav", "") for item in files_audios if item.endswith("_gen.wav"))
+
+
 def get_checkpoints_project(project_name, is_gradio=True):
     if project_name is None:
         return [], ""
     project_name = project_name.replace("_pinyin", "").replace("_char", "")
+    path_ckpts = os.path.join(path_project_ckpts, project_name)
 
-    if os.path.isdir(path_project_ckpts):
-        files_checkpoints = glob(os.path.join(path_project_ckpts, project_name, "*.pt"))
-        # Separate pretrained and regular checkpoints
-        pretrained_checkpoints = [f for f in files_checkpoints if "pretrained_" in os.path.basename(f)]
-        regular_checkpoints = [
-            f
-            for f in files_checkpoints
-            if "pretrained_" not in os.path.basename(f) and "model_last.pt" not in os.path.basename(f)
-        ]
-        last_checkpoint = [f for f in files_checkpoints if "model_last.pt" in os.path.basename(f)]
-
-        # Sort regular checkpoints by number
-        regular_checkpoints = sorted(
-            regular_checkpoints, key=lambda x: int(os.path.basename(x).split("_")[1].split(".")[0])
-        )
-
-        # Combine in order: pretrained, regular, last
-        files_checkpoints = pretrained_checkpoints + regular_checkpoints + last_checkpoint
+    if os.path.isdir(path_ckpts):
+        files_checkpoints = list(scan_checkpoints(path_ckpts, os.stat(path_ckpts).st_mtime_ns))
     else:
         files_checkpoints = []
 
@@ -1262,16 +1541,28 @@ def get_checkpoints_project(project_name, is_gradio=True):
     return files_checkpoints, selelect_checkpoint
 
 
+def refresh_checkpoints_project(project_name):
+    # Checkpoints such as model_last.pt are overwritten in place, reload the inference models on the next click
+    clear_tts_api_cache()
+    return get_checkpoints_project(project_name)
+
+
+def load_project(project_name, num_outputs):
+    values = (*load_settings(project_name), get_checkpoints_project(project_name), get_audio_project(project_name))
+    # Gradio only reports a generic error on a count mismatch, name both sides instead
+    if len(values) != num_outputs:
+        raise ValueError(f"load_project returned {len(values)} values for {num_outputs} project outputs")
+    return values
+
+
 def get_audio_project(project_name, is_gradio=True):
     if project_name is None:
         return [], ""
     project_name = project_name.replace("_pinyin", "").replace("_char", "")
+    path_samples = os.path.join(path_project_ckpts, project_name, "samples")
 
-    if os.path.isdir(path_project_ckpts):
-        files_audios = glob(os.path.join(path_project_ckpts, project_name, "samples", "*.wav"))
-        files_audios = sorted(files_audios, key=lambda x: int(os.path.basename(x).split("_")[1].split(".")[0]))
-
-        files_audios = [item.replace("_gen.wav", "") for item in files_audios if item.endswith("_gen.wav")]
+    if os.path.isdir(path_samples):
+        files_audios = list(scan_samples(path_samples, os.stat(path_samples).st_mtime_ns))
     else:
         files_audios = []
 
@@ -1286,11 +1577,11 @@ def get_audio_project(project_name, is_gradio=True):
 def get_gpu_stats():
     gpu_stats = ""
 
-    if torch.cuda.is_available():
-        gpu_count = torch.cuda.device_count()
+    if device == "cuda":
+        gpu_count = get_device_count("cuda")
         for i in range(gpu_count):
-            gpu_name = torch.cuda.get_device_name(i)
-            gpu_properties = torch.cuda.get_device_properties(i)
+            gpu_properties = get_device_properties("cuda", i)
+            gpu_name = gpu_properties.name
             total_memory = gpu_properties.total_memory / (1024**3)  # in GB
             allocated_memory = torch.cuda.memory_allocated(i) / (1024**2)  # in MB
             reserved_memory = torch.cuda.memory_reserved(i) / (1024**2)  # in MB
@@ -1301,11 +1592,11 @@ def get_gpu_stats():
                 f"Allocated GPU memory (GPU {i}): {allocated_memory:.2f} MB\n"
                 f"Reserved GPU memory (GPU {i}): {reserved_memory:.2f} MB\n\n"
             )
-    elif torch.xpu.is_available():
-        gpu_count = torch.xpu.device_count()
+    elif device == "xpu":
+        gpu_count = get_device_count("xpu")
         for i in range(gpu_count):
-            gpu_name = torch.xpu.get_device_name(i)
-            gpu_properties = torch.xpu.get_device_properties(i)
+            gpu_properties = get_device_properties("xpu", i)
+            gpu_name = gpu_properties.name
             total_memory = gpu_properties.total_memory / (1024**3)  # in GB
             allocated_memory = torch.xpu.memory_allocated(i) / (1024**2)  # in MB
             reserved_memory = torch.xpu.memory_reserved(i) / (1024**2)  # in MB
@@ -1316,7 +1607,7 @@ def get_gpu_stats():
                 f"Allocated GPU memory (GPU {i}): {allocated_memory:.2f} MB\n"
                 f"Reserved GPU memory (GPU {i}): {reserved_memory:.2f} MB\n\n"
             )
-    elif torch.backends.mps.is_available():
+    elif device == "mps":
         gpu_count = 1
         gpu_stats += "MPS GPU\n"
         total_memory = psutil.virtual_memory().total / (
@@ -1337,8 +1628,12 @@ def get_gpu_stats():
     return gpu_stats
 
 
+# Prime the baseline so the non-blocking readings below report usage since the previous call
+psutil.cpu_percent(interval=None)
+
+
 def get_cpu_stats():
-    cpu_usage = psutil.cpu_percent(interval=1)
+    cpu_usage = psutil.cpu_percent(interval=None)
     memory_info = psutil.virtual_memory()
     memory_used = memory_info.used / (1024**2)
     memory_total = memory_info.total / (1024**2)
@@ -1357,13 +1652,19 @@ def get_cpu_stats():
     return cpu_stats
 
 
-def get_combined_stats():
+# Keyed by the current second, so the button and the timer firing together only probe the system once
+@lru_cache(maxsize=1)
+def get_combined_stats_at(second):
     gpu_stats = get_gpu_stats()
     cpu_stats = get_cpu_stats()
     combined_stats = f"### GPU Stats\n{gpu_stats}\n\n### CPU Stats\n{cpu_stats}"
     return combined_stats
 
 
+def get_combined_stats():
+    return get_combined_stats_at(int(time.time()))
+
+
 def get_audio_select(file_sample):
     select_audio_ref = file_sample
     select_audio_gen = file_sample
@@ -1405,7 +1706,7 @@ For tutorial and updates check here (https://github.com/SWivid/F5-TTS/discussion
 
     bt_create.click(fn=create_data_project, inputs=[project_name, tokenizer_type], outputs=[cm_project])
 
-    with gr.Tabs():
+    with gr.Tabs() as tabs:
         with gr.TabItem("Transcribe Data"):
             gr.Markdown("""```plaintext 
 Skip this step if you have your dataset, metadata.csv, and a folder wavs with all the audio files.                 
@@ -1663,7 +1964,6 @@ If you encounter a memory error, try reducing the batch size per GPU to a smalle
                 )
                 bt_stream_audio = gr.Button("Refresh", scale=1)
                 bt_stream_audio.click(fn=get_audio_project, inputs=[cm_project], outputs=[ch_list_audio])
-                cm_project.change(fn=get_audio_project, inputs=[cm_project], outputs=[ch_list_audio])
 
             with gr.Row():
                 audio_ref_stream = gr.Audio(label="Original", type="filepath", value=select_audio_ref)
@@ -1675,6 +1975,29 @@ If you encounter a memory error, try reducing the batch size per GPU to a smalle
                 outputs=[audio_ref_stream, audio_gen_stream],
             )
 
+            # Components filled by load_settings, in the order of its return tuple
+            settings_components = [
+                exp_name,
+                learning_rate,
+                batch_size_per_gpu,
+                batch_size_type,
+                max_samples,
+                grad_accumulation_steps,
+                max_grad_norm,
+                epochs,
+                num_warmup_updates,
+                save_per_updates,
+                keep_last_n_checkpoints,
+                last_per_updates,
+                ch_finetune,
+                file_checkpoint_train,
+                tokenizer_type,
+                tokenizer_file,
+                mixed_precision,
+                cd_logger,
+                ch_8bit_adam,
+            ]
+
             start_button.click(
                 fn=start_training,
                 inputs=[
@@ -1730,42 +2053,11 @@ If you encounter a memory error, try reducing the batch size per GPU to a smalle
                 check_finetune, inputs=[ch_finetune], outputs=[file_checkpoint_train, tokenizer_file, tokenizer_type]
             )
 
-            def setup_load_settings():
-                output_components = [
-                    exp_name,
-                    learning_rate,
-                    batch_size_per_gpu,
-                    batch_size_type,
-                    max_samples,
-                    grad_accumulation_steps,
-                    max_grad_norm,
-                    epochs,
-                    num_warmup_updates,
-                    save_per_updates,
-                    keep_last_n_checkpoints,
-                    last_per_updates,
-                    ch_finetune,
-                    file_checkpoint_train,
-                    tokenizer_type,
-                    tokenizer_file,
-                    mixed_precision,
-                    cd_logger,
-                    ch_8bit_adam,
-                ]
-                return output_components
-
-            outputs = setup_load_settings()
-
-            cm_project.change(
-                fn=load_settings,
-                inputs=[cm_project],
-                outputs=outputs,
-            )
-
             ch_refresh_project.click(
                 fn=load_settings,
                 inputs=[cm_project],
-                outputs=outputs,
+                outputs=settings_components,
+                concurrency_limit=None,
             )
 
         with gr.TabItem("Test Model"):
@@ -1782,6 +2074,10 @@ Check the use_ema setting (True or False) for your model to see what works best
                 speed = gr.Slider(label="Speed", value=1.0, minimum=0.3, maximum=2.0, step=0.1)
                 seed = gr.Number(label="Random Seed", value=-1, minimum=-1)
                 remove_silence = gr.Checkbox(label="Remove Silence")
+                ch_compile = gr.Checkbox(
+                    label="Compile Model", value=False, info="torch.compile, first inference of each length is slower"
+                )
+                infer_precision = gr.Radio(label="Precision", choices=["auto", "fp32", "fp16", "bf16"], value="auto")
 
             with gr.Row():
                 ch_use_ema = gr.Checkbox(
@@ -1810,7 +2106,7 @@ Check the use_ema setting (True or False) for your model to see what works best
             gen_audio = gr.Audio(label="Generated Audio", type="filepath")
 
             check_button_infer.click(
-                fn=infer,
+                fn=infer_async,
                 inputs=[
                     cm_project,
                     cm_checkpoint,
@@ -1823,12 +2119,25 @@ Check the use_ema setting (True or False) for your model to see what works best
                     speed,
                     seed,
                     remove_silence,
+                    ch_compile,
+                    infer_precision,
                 ],
                 outputs=[gen_audio, txt_info_gpu, seed_info],
+                concurrency_id="gpu",
+                concurrency_limit=1,
             )
 
-            bt_checkpoint_refresh.click(fn=get_checkpoints_project, inputs=[cm_project], outputs=[cm_checkpoint])
-            cm_project.change(fn=get_checkpoints_project, inputs=[cm_project], outputs=[cm_checkpoint])
+            bt_checkpoint_refresh.click(
+                fn=refresh_checkpoints_project, inputs=[cm_project], outputs=[cm_checkpoint], concurrency_limit=None
+            )
+            # Single round trip on project switch: training settings, test checkpoints and sample audios
+            project_outputs = [*settings_components, cm_checkpoint, ch_list_audio]
+            cm_project.change(
+                fn=partial(load_project, num_outputs=len(project_outputs)),
+                inputs=[cm_project],
+                outputs=project_outputs,
+                concurrency_limit=None,
+            )
 
         with gr.TabItem("Prune Checkpoint"):
             gr.Markdown("""```plaintext 
@@ -1854,12 +2163,16 @@ Reduce the Base model size from 5GB to 1.3GB. The new checkpoint file prunes out
                 return get_combined_stats()
 
             update_button = gr.Button("Update Stats")
-            update_button.click(fn=update_stats, outputs=output_box)
+            update_button.click(fn=update_stats, outputs=output_box, concurrency_limit=None)
+
+            # Only poll while the tab is shown
+            stats_timer = gr.Timer(5.0, active=False)
+            stats_timer.tick(fn=update_stats, outputs=output_box, concurrency_limit=None)
 
-            def auto_update():
-                yield gr.update(value=update_stats())
+            def toggle_stats_timer(evt: gr.SelectData):
+                return gr.Timer(active=evt.value == "System Info")
 
-            gr.update(fn=auto_update, inputs=[], outputs=output_box)
+            tabs.select(fn=toggle_stats_timer, outputs=stats_timer)
 
 
 @click.command()
@@ -1876,7 +2189,11 @@ Reduce the Base model size from 5GB to 1.3GB. The new checkpoint file prunes out
 def main(port, host, share, api):
     global app
     print("Starting app...")
-    app.queue(api_open=api).launch(server_name=host, server_port=port, share=share, show_api=api)
+    # Each event runs one job at a time unless marked otherwise, cheap lookups opt out with concurrency_limit=None.
+    # A bounded queue rejects new jobs instead of letting them pile up behind long inferences.
+    app.queue(default_concurrency_limit=1, max_size=64, api_open=api).launch(
+        server_name=host, server_port=port, share=share, show_api=api
+    )
 
 
 if __name__ == "__main__":